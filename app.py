@@ -1,15 +1,31 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from hmac import compare_digest
+from http import HTTPStatus
+from itertools import count
 from logging import Logger, getLogger
-from typing import Any
+from typing import Any, Iterator
 
 from curl_cffi import Response as CurlResponse, Session
-from fastapi import Depends, FastAPI, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse, Response
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response
+from pydantic import ValidationError
 
-from config.constants import DEFAULT_USER_AGENT
+from config.constants import (
+    ADMIN_TOKEN,
+    ADMISSION_MAX_IN_FLIGHT,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_QUEUE_TIMEOUT,
+    DEFAULT_USER_AGENT,
+    PROFILE_DIR,
+    PROFILE_SAMPLE_RATE,
+)
+from models.comparison import PriceComparison
 from models.feed import JsonFeedTopLevel
 from models.query import (
     AmazonAsinQuery,
     AmazonKeywordQuery,
+    ComparisonParams,
     QueryConfig,
     QueryParams,
     QueryStatus,
@@ -17,16 +33,58 @@ from models.query import (
 from models.validators import convert_to_locale
 from parsers.item_parser import parse_item_details
 from parsers.search_parser import parse_search_results
-from services.item_generator import get_top_level_feed
-from services.ld_generator import get_html
+from services.admission import AdmissionControlMiddleware, AdmissionGate
+from services.fetch_cache import get_cached_items, store_items
+from services.item_generator import get_comparison_feed, get_top_level_feed
+from services.ld_generator import generate_aggregate_offer, render_json_ld
+from services.price_comparison import compare_prices
 from services.response_handler import get_response
+from services.snapshot import start_snapshots, stop_snapshots
 from services.url_builder import get_dimension_url, get_search_url
+from utils.filter import compile_filter
+from utils.profiler import SamplingProfiler, save_profile
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    start_snapshots()
+    yield
+    stop_snapshots()
+
 
-app: FastAPI = FastAPI()
+app: FastAPI = FastAPI(lifespan=lifespan)
 logger: Logger = getLogger(name="uvicorn.error")
 
+admission_gates: dict[str, AdmissionGate] = {
+    name: AdmissionGate(
+        max_in_flight=max_in_flight,
+        max_queue=ADMISSION_MAX_QUEUE,
+        queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+    )
+    for name, max_in_flight in ADMISSION_MAX_IN_FLIGHT.items()
+}
+app.add_middleware(
+    AdmissionControlMiddleware,
+    gates=admission_gates,
+    paths={"/": "query", "/query": "query", "/asin": "asin", "/compare": "compare"},
+)
+
+
+@app.exception_handler(ValidationError)
+async def validation_error_handler(
+    request: Request, exc: ValidationError
+) -> JSONResponse:
+    """Report invalid query parameters as 422, not as an internal error."""
+    return JSONResponse(
+        content={"detail": exc.errors(include_url=False, include_context=False)},
+        status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+    )
+
 
 class AmazonFeedGenerator:
+    def __init__(self) -> None:
+        self.request_counter: Iterator[int] = count(start=1)
+
     def create_query_config(self) -> QueryConfig:
         return QueryConfig(
             session=Session(),
@@ -41,15 +99,17 @@ class AmazonFeedGenerator:
         url_builder_func,
         parser_func,
     ) -> Response:
-        try:
-            config: QueryConfig = self.create_query_config()
+        config: QueryConfig = self.create_query_config()
 
+        try:
             query: AmazonAsinQuery | AmazonKeywordQuery = query_class(
                 status=QueryStatus(),
                 query_str=params.q,
                 locale=convert_to_locale(value=params.country),
                 min_price=params.min_price,
                 max_price=params.max_price,
+                strict=params.strict,
+                item_filter=compile_filter(params.filter) if params.filter else None,
                 jsonld=params.jsonld,
                 config=config,
             )
@@ -62,16 +122,42 @@ class AmazonFeedGenerator:
             )
 
             if isinstance(response, CurlResponse):
-                feed_items: list = parser_func(response, query, base_url)
+                feed_items: list | None = get_cached_items(search_url, query, response)
+                cache_headers: dict[str, str] = {
+                    "X-Cache": "MISS" if feed_items is None else "HIT"
+                }
+
+                # Not modified, but the cached entry has since been evicted
+                if (
+                    feed_items is None
+                    and response.status_code == HTTPStatus.NOT_MODIFIED
+                ):
+                    response = get_response(
+                        url=search_url, query=query, conditional=False
+                    )
+
+                    if not isinstance(response, CurlResponse):
+                        return response
+
+                if feed_items is None:
+                    feed_items = parser_func(response, query, base_url)
+                    store_items(search_url, query, response, feed_items)
 
                 if params.jsonld:
-                    html_text: str = get_html(feed_items)
-                    return HTMLResponse(content=html_text)
+                    html_content: bytes = render_json_ld(
+                        feed_items,
+                        include_body=params.jsonld_body,
+                        item_list=params.jsonld_itemlist,
+                    )
+                    return HTMLResponse(content=html_content, headers=cache_headers)
                 else:
                     json_feed: JsonFeedTopLevel = get_top_level_feed(
                         base_url, query, feed_items
                     )
-                    return JSONResponse(content=json_feed.model_dump(exclude_none=True))
+                    return JSONResponse(
+                        content=json_feed.model_dump(exclude_none=True),
+                        headers=cache_headers,
+                    )
 
             return response
 
@@ -80,14 +166,98 @@ class AmazonFeedGenerator:
             logger.error(msg=error_msg)
             raise HTTPException(status_code=500, detail=error_msg)
 
+        finally:
+            config.session.close()
+
+    def is_profiling_requested(self, request: Request, params: QueryParams) -> bool:
+        """Check for profile=1 or an X-Profile header, allowed for admins only."""
+        if not params.profile and request.headers.get("X-Profile") != "1":
+            return False
+
+        admin_token: str = request.headers.get("X-Admin-Token", "")
+
+        if not ADMIN_TOKEN or not compare_digest(admin_token, ADMIN_TOKEN):
+            raise HTTPException(status_code=403, detail="Profiling requires admin")
+
+        return True
+
+    def process_profiled_query(
+        self, request: Request, params: QueryParams, **kwargs
+    ) -> Response:
+        """
+        Run process_query, under the sampling profiler when requested or sampled.
+
+        Requested profiles are returned as collapsed stacks, sampled ones are
+        only written to the profile ring buffer.
+        """
+        is_requested: bool = self.is_profiling_requested(request, params)
+        # Sampled profiles are only kept in PROFILE_DIR, so skip them without one
+        is_sampled: bool = bool(PROFILE_DIR and PROFILE_SAMPLE_RATE) and (
+            next(self.request_counter) % PROFILE_SAMPLE_RATE == 0
+        )
+
+        if not is_requested and not is_sampled:
+            return self.process_query(params, **kwargs)
+
+        with SamplingProfiler() as profiler:
+            response: Response = self.process_query(params, **kwargs)
+
+        collapsed_stacks: str = profiler.get_collapsed_stacks()
+
+        try:
+            profile_path: str | None = save_profile(
+                collapsed_stacks, name=request.url.path.strip("/") or "query"
+            )
+            logger.info(msg=f"Profiled {request.url.path}: {profile_path}")
+        except Exception as e:
+            logger.error(msg=f"Profile save error: {e}")
+
+        if is_requested:
+            return PlainTextResponse(content=collapsed_stacks)
+
+        return response
+
+    def process_comparison(self, params: ComparisonParams) -> Response:
+        try:
+            comparison: PriceComparison = compare_prices(
+                params, create_query_config=self.create_query_config
+            )
+
+            # Every lookup failed, which an empty feed would not tell apart
+            if not comparison.offers:
+                error_msg: str = (
+                    f"Price comparison error: {comparison.describe_failures()}"
+                )
+                logger.error(msg=error_msg)
+                return JSONResponse(
+                    content={"detail": error_msg}, status_code=HTTPStatus.BAD_GATEWAY
+                )
+
+            if params.jsonld:
+                html_content: bytes = render_json_ld(
+                    [generate_aggregate_offer(params, comparison)],
+                    include_body=params.jsonld_body,
+                    item_list=params.jsonld_itemlist,
+                )
+                return HTMLResponse(content=html_content)
+
+            json_feed: JsonFeedTopLevel = get_comparison_feed(params, comparison)
+            return JSONResponse(content=json_feed.model_dump(exclude_none=True))
+
+        except Exception as e:
+            error_msg: str = f"Price comparison error: {e}"
+            logger.error(msg=error_msg)
+            raise HTTPException(status_code=500, detail=error_msg)
+
 
 feed_generator: AmazonFeedGenerator = AmazonFeedGenerator()
 
 
 @app.get(path="/")
 @app.get(path="/query")
-async def keyword_search(params: QueryParams = Depends()) -> Response:
-    return feed_generator.process_query(
+def keyword_search(request: Request, params: QueryParams = Depends()) -> Response:
+    return feed_generator.process_profiled_query(
+        request,
         params,
         query_class=AmazonKeywordQuery,
         url_builder_func=get_search_url,
@@ -96,8 +266,9 @@ async def keyword_search(params: QueryParams = Depends()) -> Response:
 
 
 @app.get(path="/asin")
-async def asin_lookup(params: QueryParams = Depends()) -> Response:
-    return feed_generator.process_query(
+def asin_lookup(request: Request, params: QueryParams = Depends()) -> Response:
+    return feed_generator.process_profiled_query(
+        request,
         params,
         query_class=AmazonAsinQuery,
         url_builder_func=get_dimension_url,
@@ -105,11 +276,27 @@ async def asin_lookup(params: QueryParams = Depends()) -> Response:
     )
 
 
+@app.get(path="/compare")
+def price_comparison(params: ComparisonParams = Depends()) -> Response:
+    return feed_generator.process_comparison(params)
+
+
 @app.get(path="/healthcheck")
 async def healthcheck() -> JSONResponse:
     return JSONResponse(content={"status": "ok"})
 
 
+@app.get(path="/metrics")
+async def metrics() -> JSONResponse:
+    return JSONResponse(
+        content={
+            "admission": {
+                name: gate.get_metrics() for name, gate in admission_gates.items()
+            }
+        }
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -1,5 +1,52 @@
+import os
+
 ITEM_QUANTITY = 1
 STREAM_DELIMITER = "&&&"  # application/json-amazonui-streaming
+FETCH_CACHE_MAX_ENTRIES = 256
+FILTER_CACHE_SIZE = 128
+# User regexes are restricted so a single filter cannot stall the process
+FILTER_REGEX_MAX_LENGTH = 64
+FILTER_REGEX_MAX_REPEATS = 2
+
+# Admission control per endpoint, requests beyond the queue get 503 + Retry-After
+ADMISSION_MAX_IN_FLIGHT: dict[str, int] = {"query": 4, "asin": 4, "compare": 2}
+ADMISSION_MAX_QUEUE = 32
+ADMISSION_QUEUE_TIMEOUT = 10.0  # seconds
+ADMISSION_RETRY_AFTER = 30  # seconds
+ADMISSION_CACHE_HIT_KEYS = 1024
+
+# Snapshots are disabled unless a writable directory is configured
+SNAPSHOT_DIR: str | None = os.environ.get("SNAPSHOT_DIR")
+SNAPSHOT_FILENAME = "snapshot.sqlite3"
+SNAPSHOT_INTERVAL = 300.0  # seconds
+SNAPSHOT_LOAD_TIMEOUT = 10.0  # seconds to wait for warm-up before serving cold
+
+# Offline FX rates for price comparison, reloaded when the file changes
+FX_RATES_FILE: str = os.environ.get(
+    "FX_RATES_FILE", os.path.join(os.path.dirname(__file__), "fx_rates.json")
+)
+COMPARE_DEFAULT_COUNTRIES = "UK,DE,FR,IT,ES"
+COMPARE_DEFAULT_CURRENCY = "EUR"
+
+# Profiling on demand requires ADMIN_TOKEN; sampled profiling stores 1 in N requests
+ADMIN_TOKEN: str | None = os.environ.get("ADMIN_TOKEN")
+PROFILE_DIR: str | None = os.environ.get("PROFILE_DIR")
+PROFILE_SAMPLE_RATE = int(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+PROFILE_INTERVAL = 0.005  # seconds between stack samples
+PROFILE_RING_SIZE = 50
+
+# Retry policy defaults, in seconds
+RETRY_MAX_ATTEMPTS = 3
+RETRY_ATTEMPT_TIMEOUT = 10.0
+RETRY_OVERALL_TIMEOUT = 25.0
+RETRY_BACKOFF_BASE = 0.5
+RETRY_BACKOFF_MAX = 4.0
+RETRY_HEDGE = True
+RETRY_STATUS_CODES: set[int] = {500, 502, 503, 504}
+
+# Hedged requests are sent once the first attempt exceeds the observed p95 latency
+HEDGE_LATENCY_SAMPLES = 200
+HEDGE_MIN_SAMPLES = 20
 
 ALLOWED_TAGS: set[str] = {"a", "img", "p"}
 ALLOWED_ATTRIBUTES: dict[str, set[str]] = {"a": {"href", "title"}, "img": {"src"}}
@@ -0,0 +1,31 @@
+from pydantic import BaseModel, ConfigDict
+from stockholm import Money
+
+from models.amazon.locale import AmazonLocale
+
+
+class LocaleOffer(BaseModel):
+    locale: AmazonLocale
+    price: Money
+    converted_price: Money
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+class LocaleFailure(BaseModel):
+    locale: AmazonLocale
+    reason: str
+
+
+class PriceComparison(BaseModel):
+    offers: list[LocaleOffer] = []
+    failures: list[LocaleFailure] = []
+
+    def describe_failures(self) -> str | None:
+        """Summarise the locales without an offer, e.g. "No offer from US (HTTP 503)"."""
+        if not self.failures:
+            return None
+
+        return "No offer from " + ", ".join(
+            f"{failure.locale.code} ({failure.reason})" for failure in self.failures
+        )
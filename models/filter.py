@@ -0,0 +1,78 @@
+import re
+
+from pydantic import BaseModel, ConfigDict
+from stockholm import Money
+
+
+class ItemFilter(BaseModel):
+    """
+    Compiled item filter, evaluated in stages from cheapest to most expensive.
+
+    Stages:
+    - title: include/exclude terms and regexes
+    - price: min/max range
+    - thumbnail: presence of a product image
+    """
+
+    expression: str = ""
+    include_terms: tuple[str, ...] = ()
+    exclude_terms: tuple[str, ...] = ()
+    include_patterns: tuple[re.Pattern[str], ...] = ()
+    exclude_patterns: tuple[re.Pattern[str], ...] = ()
+    min_price: float | None = None
+    max_price: float | None = None
+    has_thumbnail: bool = False
+
+    model_config = ConfigDict(frozen=True)
+
+    @property
+    def filters_title(self) -> bool:
+        return bool(
+            self.include_terms
+            or self.exclude_terms
+            or self.include_patterns
+            or self.exclude_patterns
+        )
+
+    def match_title(self, title: str) -> bool:
+        if not self.filters_title:
+            return True
+
+        title_lower: str = title.lower()
+
+        return (
+            all(term in title_lower for term in self.include_terms)
+            and not any(term in title_lower for term in self.exclude_terms)
+            and all(pattern.search(title) for pattern in self.include_patterns)
+            and not any(pattern.search(title) for pattern in self.exclude_patterns)
+        )
+
+    def match_price(self, price: Money) -> bool:
+        if self.min_price and price < self.min_price:
+            return False
+        if self.max_price and price > self.max_price:
+            return False
+        return True
+
+    def match_thumbnail(self, has_thumbnail: bool) -> bool:
+        return has_thumbnail or not self.has_thumbnail
+
+    def narrow(
+        self,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        include_terms: set[str] | None = None,
+    ) -> "ItemFilter":
+        """Return a copy further restricted by the query's own price and strict filters."""
+        min_prices: list[float] = [p for p in (self.min_price, min_price) if p]
+        max_prices: list[float] = [p for p in (self.max_price, max_price) if p]
+
+        return self.model_copy(
+            update={
+                "include_terms": tuple(
+                    dict.fromkeys([*self.include_terms, *sorted(include_terms or [])])
+                ),
+                "min_price": max(min_prices) if min_prices else None,
+                "max_price": min(max_prices) if max_prices else None,
+            }
+        )
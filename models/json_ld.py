@@ -18,12 +18,37 @@ class Offer(Thing):
     priceCurrency: str | None = None
     price: Decimal | None = None
     availability: str | None = "https://schema.org/InStock"
+    url: SerHttpUrl | None = None
+    eligibleRegion: str | None = None
+
+
+class AggregateOffer(Thing):
+    type: str = Field(default="AggregateOffer", serialization_alias="@type")
+    priceCurrency: str | None = None
+    lowPrice: Decimal | None = None
+    highPrice: Decimal | None = None
+    offerCount: int = 0
+    offers: list[Offer] = []
 
 
 class Product(Thing):
     type: str = Field(default="Product", serialization_alias="@type")
     context: str = Field(default="https://schema.org/", serialization_alias="@context")
     name: str | None
+    description: str | None = None
     asin: Asin | None
     image: list[SerHttpUrl] | None
-    offers: Offer | None
+    offers: Offer | AggregateOffer | None
+
+
+class ListItem(Thing):
+    type: str = Field(default="ListItem", serialization_alias="@type")
+    position: int
+    item: Product
+
+
+class ItemList(Thing):
+    type: str = Field(default="ItemList", serialization_alias="@type")
+    context: str = Field(default="https://schema.org/", serialization_alias="@context")
+    numberOfItems: int
+    itemListElement: list[ListItem]
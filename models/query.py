@@ -3,12 +3,32 @@ from typing import Annotated
 
 from curl_cffi import Session
 from fastapi import Query
-from pydantic import AfterValidator, BaseModel, Field, PositiveFloat
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    Field,
+    PositiveFloat,
+    PositiveInt,
+)
 
+from config.constants import (
+    COMPARE_DEFAULT_COUNTRIES,
+    COMPARE_DEFAULT_CURRENCY,
+    RETRY_ATTEMPT_TIMEOUT,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+    RETRY_HEDGE,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_OVERALL_TIMEOUT,
+)
 from models.amazon.locale import AmazonLocale, default_locale
+from models.filter import ItemFilter
 from models.validators import (
     validate_asin,
+    validate_countries,
     validate_country,
+    validate_currency,
+    validate_filter,
     validate_query_str,
 )
 
@@ -17,10 +37,20 @@ def string_to_boolean(string: str) -> bool:
     return string.lower().strip() in ["yes", "true"]
 
 
+class RetryPolicy(BaseModel):
+    max_attempts: PositiveInt = RETRY_MAX_ATTEMPTS
+    attempt_timeout: PositiveFloat = RETRY_ATTEMPT_TIMEOUT
+    overall_timeout: PositiveFloat = RETRY_OVERALL_TIMEOUT
+    backoff_base: PositiveFloat = RETRY_BACKOFF_BASE
+    backoff_max: PositiveFloat = RETRY_BACKOFF_MAX
+    hedge: bool = RETRY_HEDGE
+
+
 class QueryConfig(BaseModel):
     session: Session
     logger: Logger
     useragent: str
+    retry_policy: RetryPolicy = RetryPolicy()
 
     class Config:
         arbitrary_types_allowed: bool = True
@@ -45,6 +75,13 @@ class _BaseQuery(BaseModel):
 class FilterableQuery(_BaseQuery):
     min_price: PositiveFloat | None = None
     max_price: PositiveFloat | None = None
+    item_filter: ItemFilter | None = None
+
+    def get_item_filter(self) -> ItemFilter:
+        """Combine the filter expression with the price parameters."""
+        return (self.item_filter or ItemFilter()).narrow(
+            min_price=self.min_price, max_price=self.max_price
+        )
 
 
 class _AmazonKeywordFilter(BaseModel):
@@ -54,6 +91,18 @@ class _AmazonKeywordFilter(BaseModel):
 class AmazonKeywordQuery(_AmazonKeywordFilter, FilterableQuery):
     query_str: Annotated[str, AfterValidator(func=validate_query_str)]
 
+    def get_item_filter(self) -> ItemFilter:
+        """Combine the filter expression with the price parameters and strict mode."""
+        strict_terms: set[str] = (
+            set(self.query_str.lower().split()) if self.strict else set()
+        )
+
+        return (self.item_filter or ItemFilter()).narrow(
+            min_price=self.min_price,
+            max_price=self.max_price,
+            include_terms=strict_terms,
+        )
+
 
 class AmazonAsinQuery(FilterableQuery):
     query_str: Annotated[str, AfterValidator(func=validate_asin)]
@@ -67,4 +116,37 @@ class QueryParams(BaseModel):
     min_price: PositiveFloat | None = Field(Query(None, description="Minimum price"))
     max_price: PositiveFloat | None = Field(Query(None, description="Maximum price"))
     strict: bool | None = Field(Query(False, description="Strict mode"))
+    filter: Annotated[str | None, AfterValidator(func=validate_filter)] = Field(
+        Query(None, description="Filter expression")
+    )
     jsonld: bool = Field(Query(False, description="Return output as JSON-LD"))
+    jsonld_body: bool = Field(
+        Query(True, description="Repeat JSON-LD in the HTML body")
+    )
+    jsonld_itemlist: bool = Field(
+        Query(False, description="Wrap JSON-LD products in an ItemList")
+    )
+    profile: bool = Field(Query(False, description="Profile this request (admin)"))
+
+
+class ComparisonParams(BaseModel):
+    asin: Annotated[str, AfterValidator(func=validate_asin)] = Field(
+        Query(..., description="ASIN")
+    )
+    countries: Annotated[str, AfterValidator(func=validate_countries)] = Field(
+        Query(COMPARE_DEFAULT_COUNTRIES, description="Comma-separated country codes")
+    )
+    currency: Annotated[str, AfterValidator(func=validate_currency)] = Field(
+        Query(COMPARE_DEFAULT_CURRENCY, description="Currency to compare prices in")
+    )
+    jsonld: bool = Field(Query(False, description="Return output as JSON-LD"))
+    jsonld_body: bool = Field(
+        Query(True, description="Repeat JSON-LD in the HTML body")
+    )
+    jsonld_itemlist: bool = Field(
+        Query(False, description="Wrap JSON-LD products in an ItemList")
+    )
+
+    @property
+    def country_codes(self) -> list[str]:
+        return self.countries.split(",")
@@ -1,6 +1,7 @@
 import re
 
 from models.amazon.locale import AmazonLocale, locale_list
+from utils.filter import compile_filter
 
 ASIN_PATTERN = r"^(B[\dA-Z]{9}|\d{9}(X|\d))$"
 
@@ -24,7 +25,35 @@ def validate_query_str(value: str) -> str:
     return value
 
 
+def validate_filter(value: str | None) -> str | None:
+    if value:
+        compile_filter(value)
+    return value
+
+
 def validate_asin(value: str) -> str:
     if not re.match(ASIN_PATTERN, value):
         raise ValueError("Invalid id (ASIN)")
     return value
+
+
+def validate_countries(value: str) -> str:
+    country_codes: list[str] = [
+        validate_country(code.strip()) for code in value.split(",") if code.strip()
+    ]
+
+    if not country_codes:
+        raise ValueError("Invalid country codes")
+
+    supported_codes: set[str] = {locale.code for locale in locale_list}
+    if unsupported_codes := set(country_codes) - supported_codes:
+        raise ValueError(f"Unsupported country codes: {', '.join(unsupported_codes)}")
+
+    return ",".join(dict.fromkeys(country_codes))
+
+
+def validate_currency(value: str) -> str:
+    if not value.isalpha() or len(value) != 3:
+        raise ValueError("Invalid currency code")
+
+    return value.upper()
@@ -4,6 +4,7 @@ from curl_cffi import Response
 from stockholm import Money
 
 from models.feed import JsonFeedItem
+from models.filter import ItemFilter
 from models.json_ld import Product
 from models.query import AmazonAsinQuery
 from services.item_generator import generate_feed_item
@@ -11,29 +12,39 @@ from services.ld_generator import generate_linked_data
 from utils.price import validate_price
 
 
+def parse_item_price(response: Response, query: AmazonAsinQuery) -> Money | None:
+    # Navigate nested JSON structure
+    price_data = (
+        response.json().get("Value", {}).get("content", {}).get("twisterSlotJson", {})
+    )
+
+    # Extract price
+    price_flt: float = price_data.get("price")
+
+    if not price_flt:
+        query.config.logger.error(msg=f"{query.query_str} - Price not found")
+        return None
+
+    return validate_price(query, str(price_flt))
+
+
 def parse_item_details(
     response: Response, query: AmazonAsinQuery, base_url: str
 ) -> list[JsonFeedItem | Product]:
     logger: Logger = query.config.logger
+    item_filter: ItemFilter = query.get_item_filter()
 
     try:
-        # Navigate nested JSON structure
-        price_data = (
-            response.json().get("Value", {}).get("content", {}).get("twisterSlotJson", {})
-        )
-
-        # Extract price
-        price_flt: float = price_data.get("price")
+        price: Money | None = parse_item_price(response, query)
 
-        if not price_flt:
-            logger.error(msg=f"{query.query_str} - Price not found")
+        if not price:
             return []
 
-        price: Money = validate_price(query, str(price_flt))
-
-        # Check against max price if specified
-        if query.max_price and price > float(query.max_price):
-            logger.info(msg=f"{query.query_str} - Exceeded max price {query.max_price}")
+        # Check against price range if specified
+        if not item_filter.match_price(price):
+            logger.info(
+                msg=f"{query.query_str} - Outside price range {item_filter.min_price}-{item_filter.max_price}"
+            )
             return []
 
         generated_items: list[JsonFeedItem | Product] = []
@@ -44,6 +55,7 @@ def parse_item_details(
                     base_url,
                     item_id=query.query_str,
                     item_price=price,
+                    trusted_asin=True,
                 )
             )
         else:
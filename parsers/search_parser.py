@@ -4,15 +4,83 @@ from bs4 import BeautifulSoup, ResultSet
 from bs4._typing import _AttributeValue
 from bs4.element import Tag
 from curl_cffi import Response
+from soupsieve import SoupSieve, compile as compile_selector
 from stockholm import Money
 
 from models.feed import JsonFeedItem
+from models.filter import ItemFilter
 from models.json_ld import Product
 from models.query import AmazonKeywordQuery
 from services.item_generator import generate_feed_item
 from services.ld_generator import generate_linked_data
 from utils.price import validate_price
 
+# Select product result divs, excluding ad holders
+RESULT_SELECTOR: SoupSieve = compile_selector("div.s-asin.s-result-item:not(.AdHolder)")
+
+TITLE_CLASS = "s-line-clamp-3"
+PRICE_CLASS = "a-price"
+PRICE_TEXT_CLASS = "a-offscreen"
+THUMBNAIL_CLASS = "s-image"
+THUMBNAIL_COMPONENT = "s-product-image"
+
+
+def _has_ancestor(elem: Tag, stop: Tag, attr: str, value: str) -> bool:
+    """Check whether an ancestor of elem, below stop, has value in attr."""
+    parent: Tag | None = elem.parent
+
+    while parent is not None and parent is not stop:
+        if value in parent.get_attribute_list(attr):
+            return True
+        parent = parent.parent
+
+    return False
+
+
+def extract_result_fields(
+    item_soup: Tag,
+) -> tuple[Tag | None, Tag | None, Tag | None]:
+    """
+    Walk a result subtree once, collecting the title, price and thumbnail tags.
+
+    Equivalent to "h2.s-line-clamp-3", ".a-price .a-offscreen" and
+    "[data-component-type=s-product-image] .s-image", first match each.
+    """
+    title_elem: Tag | None = None
+    price_elem: Tag | None = None
+    thumbnail_elem: Tag | None = None
+
+    for elem in item_soup.descendants:
+        if not isinstance(elem, Tag):
+            continue
+
+        classes: list[str] = elem.get_attribute_list("class")
+
+        if not classes:
+            continue
+
+        if title_elem is None and elem.name == "h2" and TITLE_CLASS in classes:
+            title_elem = elem
+        elif (
+            price_elem is None
+            and PRICE_TEXT_CLASS in classes
+            and _has_ancestor(elem, item_soup, "class", PRICE_CLASS)
+        ):
+            price_elem = elem
+        elif (
+            thumbnail_elem is None
+            and THUMBNAIL_CLASS in classes
+            and _has_ancestor(
+                elem, item_soup, "data-component-type", THUMBNAIL_COMPONENT
+            )
+        ):
+            thumbnail_elem = elem
+
+        if title_elem and price_elem and thumbnail_elem:
+            break
+
+    return title_elem, price_elem, thumbnail_elem
+
 
 def parse_search_results(
     response: Response,
@@ -32,55 +100,49 @@ def parse_search_results(
     # Parse HTML
     soup: BeautifulSoup = BeautifulSoup(markup=response.content, features="html.parser")
 
-    # Select product result divs, excluding ad holders
-    results: ResultSet[Tag] = soup.select(
-        selector="div.s-asin.s-result-item:not(.AdHolder)"
-    )
+    results: ResultSet[Tag] = RESULT_SELECTOR.select(soup)
 
     # Create dictionary of results by ASIN
     results_dict: dict[_AttributeValue, Tag] = {
         div["data-asin"]: div for div in results if div.get(key="data-asin")
     }
 
-    # Strict search term filtering
-    strict_terms: set[str] = (
-        set(query.query_str.lower().split()) if query.strict else set()
-    )
+    # Strict mode, price range and filter expression
+    item_filter: ItemFilter = query.get_item_filter()
 
     generated_items: list[JsonFeedItem | Product] = []
 
     for item_id, item_soup in results_dict.items():
-        # Extract product details
-        title_elem: Tag | None = item_soup.select_one(selector="h2.s-line-clamp-3")
+        # Extract product details in a single pass
+        title_elem, price_elem, thumbnail_elem = extract_result_fields(item_soup)
+
+        if not price_elem:
+            continue
+
         title: str = str(title_elem["aria-label"]).strip() if title_elem else ""
 
-        # Price extraction
-        price_elem: Tag | None = item_soup.select_one(selector=".a-price .a-offscreen")
+        # Title filtering, before any price allocation
+        if not item_filter.match_title(title):
+            logger.debug(msg=f"Title filter: Skipping {item_id}")
+            continue
 
-        if not price_elem:
+        # Thumbnail filtering
+        if not item_filter.match_thumbnail(thumbnail_elem is not None):
+            logger.debug(msg=f"Thumbnail filter: Skipping {item_id}")
             continue
 
+        # Price extraction and filtering
         price: Money = validate_price(query, price_str=price_elem.text)
 
+        if not item_filter.match_price(price):
+            logger.debug(msg=f"Price filter: Skipping {item_id}")
+            continue
+
         # Thumbnail extraction
-        thumbnail_elem: Tag | None = item_soup.find(
-            attrs={"data-component-type": "s-product-image"}
-        )
-        thumbnail_subelem: Tag | None = (
-            thumbnail_elem.select_one(selector=".s-image") if thumbnail_elem else None
-        )
         thumbnail_url: _AttributeValue | None = (
-            thumbnail_subelem.get(key="src")
-            if thumbnail_elem and thumbnail_subelem
-            else None
+            thumbnail_elem.get(key="src") if thumbnail_elem else None
         )
 
-        # Strict mode filtering
-        if query.strict and strict_terms:
-            if not all(term in title.lower() for term in strict_terms):
-                logger.debug(msg=f"Strict mode: Skipping {item_id}")
-                continue
-
         # Generate feed item
         try:
             if query.jsonld:
@@ -90,7 +152,9 @@ def parse_search_results(
                         item_id=str(item_id),
                         item_title=title,
                         item_price=price,
-                        item_thumbnail_url=str(thumbnail_url),
+                        item_thumbnail_url=(
+                            str(thumbnail_url) if thumbnail_url else None
+                        ),
                     )
                 )
             else:
@@ -100,7 +164,9 @@ def parse_search_results(
                         item_id=str(item_id),
                         item_title=title,
                         item_price=price,
-                        item_thumbnail_url=str(thumbnail_url),
+                        item_thumbnail_url=(
+                            str(thumbnail_url) if thumbnail_url else None
+                        ),
                     )
                 )
         except Exception as e:
@@ -0,0 +1,152 @@
+import asyncio
+from collections import OrderedDict
+from heapq import heappop, heappush
+from http import HTTPStatus
+from itertools import count
+from typing import Iterator
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.constants import ADMISSION_CACHE_HIT_KEYS, ADMISSION_RETRY_AFTER
+
+CACHE_HEADER = b"x-cache"
+CACHE_HIT = b"HIT"
+
+
+class AdmissionGate:
+    """
+    Bound the in-flight requests of one endpoint, with a bounded wait queue.
+
+    Waiters are admitted by priority, then arrival order. Only used from the
+    event loop, so no locking is needed.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float):
+        self.max_in_flight: int = max_in_flight
+        self.max_queue: int = max_queue
+        self.queue_timeout: float = queue_timeout
+        self.in_flight: int = 0
+        self.admitted: int = 0
+        self.rejected: int = 0
+        self.timed_out: int = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence: Iterator[int] = count()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    async def acquire(self, is_priority: bool = False) -> bool:
+        """Wait for a slot, returning False if the queue is full or the wait times out."""
+        if self.in_flight < self.max_in_flight and not self.queued:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            return False
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heappush(self._waiters, (0 if is_priority else 1, next(self._sequence), waiter))
+
+        try:
+            # A released slot is handed over directly, in_flight is unchanged
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            # The slot may have been handed over in the same loop iteration
+            if not self._was_handed_slot(waiter):
+                self.timed_out += 1
+                return False
+        except asyncio.CancelledError:
+            # Pass on a slot that was handed over before the cancellation
+            if self._was_handed_slot(waiter):
+                self.release()
+            raise
+
+        self.admitted += 1
+        return True
+
+    @staticmethod
+    def _was_handed_slot(waiter: asyncio.Future[None]) -> bool:
+        return waiter.done() and not waiter.cancelled()
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, waiter = heappop(self._waiters)
+
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+        self.in_flight -= 1
+
+    def get_metrics(self) -> dict[str, int]:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+class AdmissionControlMiddleware:
+    """
+    Admit requests to gated paths, shedding load with 503 and Retry-After.
+
+    Paths without a gate (e.g. /healthcheck) bypass admission entirely.
+    Requests whose last response was a cache hit jump ahead of the queue.
+    """
+
+    def __init__(
+        self, app: ASGIApp, gates: dict[str, AdmissionGate], paths: dict[str, str]
+    ) -> None:
+        self.app: ASGIApp = app
+        self.gates: dict[str, AdmissionGate] = gates
+        self.paths: dict[str, str] = paths
+        self.cache_hits: OrderedDict[str, None] = OrderedDict()
+
+    def record_cache_status(self, request_key: str, message: Message) -> None:
+        if (CACHE_HEADER, CACHE_HIT) in message.get("headers", []):
+            self.cache_hits[request_key] = None
+            self.cache_hits.move_to_end(request_key)
+
+            while len(self.cache_hits) > ADMISSION_CACHE_HIT_KEYS:
+                self.cache_hits.popitem(last=False)
+        else:
+            self.cache_hits.pop(request_key, None)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        gate_name: str | None = (
+            self.paths.get(scope["path"]) if scope["type"] == "http" else None
+        )
+
+        if not gate_name:
+            await self.app(scope, receive, send)
+            return
+
+        gate: AdmissionGate = self.gates[gate_name]
+        request_key: str = f"{scope['path']}?{scope['query_string'].decode()}"
+
+        if not await gate.acquire(is_priority=request_key in self.cache_hits):
+            response: JSONResponse = JSONResponse(
+                content={"detail": f"{gate_name} is overloaded, retry later"},
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(ADMISSION_RETRY_AFTER)},
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_cache_status(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                self.record_cache_status(request_key, message)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cache_status)
+        finally:
+            gate.release()
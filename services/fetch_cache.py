@@ -0,0 +1,135 @@
+from collections import OrderedDict
+from hashlib import blake2b
+from http import HTTPStatus
+from threading import Event, Lock
+
+from curl_cffi import Response as CurlResponse
+from pydantic import BaseModel
+
+from config.constants import FETCH_CACHE_MAX_ENTRIES, SNAPSHOT_LOAD_TIMEOUT
+from models.feed import JsonFeedItem
+from models.json_ld import Product
+from models.query import FilterableQuery
+
+
+class CachedFetch(BaseModel):
+    etag: str | None = None
+    last_modified: str | None = None
+    body_hash: str
+    feed_items: list[JsonFeedItem | Product]
+
+
+_cache: OrderedDict[str, CachedFetch] = OrderedDict()
+_cache_lock: Lock = Lock()
+
+# Cleared while a snapshot is being loaded, lookups wait for it to be set
+warm_event: Event = Event()
+warm_event.set()
+
+
+def get_cache_key(url: str, query: FilterableQuery) -> str:
+    """Key cached items by upstream URL and every query field that affects parsing."""
+    return f"{url}|{query.model_dump_json(exclude={'status', 'config'})}"
+
+
+def get_body_hash(content: bytes) -> str:
+    return blake2b(content, digest_size=16).hexdigest()
+
+
+def _get_entry(cache_key: str) -> CachedFetch | None:
+    # Wait for a loading snapshot once; after a timeout, serve cold until it lands
+    if not warm_event.is_set() and not warm_event.wait(timeout=SNAPSHOT_LOAD_TIMEOUT):
+        warm_event.set()
+
+    with _cache_lock:
+        entry: CachedFetch | None = _cache.get(cache_key)
+        if entry:
+            _cache.move_to_end(cache_key)
+
+    return entry
+
+
+def get_conditional_headers(url: str, query: FilterableQuery) -> dict[str, str]:
+    """Return If-None-Match/If-Modified-Since headers for a previously seen response."""
+    entry: CachedFetch | None = _get_entry(get_cache_key(url, query))
+
+    headers: dict[str, str] = {}
+
+    if entry:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+    return headers
+
+
+def get_cached_items(
+    url: str, query: FilterableQuery, response: CurlResponse
+) -> list[JsonFeedItem | Product] | None:
+    """
+    Return previously built items if the upstream response is unchanged.
+
+    A response is unchanged when the server answered 304 Not Modified or
+    the body hashes to the same value as the last one seen for this key.
+    """
+    entry: CachedFetch | None = _get_entry(get_cache_key(url, query))
+
+    if not entry:
+        return None
+
+    if response.status_code == HTTPStatus.NOT_MODIFIED:
+        query.config.logger.debug(msg=f"{query.query_str} - not modified")
+        return entry.feed_items
+
+    if get_body_hash(response.content) == entry.body_hash:
+        query.config.logger.debug(msg=f"{query.query_str} - unchanged body")
+        return entry.feed_items
+
+    return None
+
+
+def store_items(
+    url: str,
+    query: FilterableQuery,
+    response: CurlResponse,
+    feed_items: list[JsonFeedItem | Product],
+) -> None:
+    """Remember validators, body hash and built items for the next fetch."""
+    if response.status_code == HTTPStatus.NOT_MODIFIED:
+        return
+
+    cache_key: str = get_cache_key(url, query)
+    entry: CachedFetch = CachedFetch(
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+        body_hash=get_body_hash(response.content),
+        feed_items=feed_items,
+    )
+
+    with _cache_lock:
+        _cache[cache_key] = entry
+        _cache.move_to_end(cache_key)
+
+        while len(_cache) > FETCH_CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def export_entries() -> list[tuple[str, CachedFetch]]:
+    """Return cached entries, least recently used first."""
+    with _cache_lock:
+        return list(_cache.items())
+
+
+def import_entries(entries: list[tuple[str, CachedFetch]]) -> None:
+    """Restore entries behind any fresher ones already cached."""
+    with _cache_lock:
+        fresh: list[tuple[str, CachedFetch]] = list(_cache.items())
+        _cache.clear()
+
+        for cache_key, entry in [*entries, *fresh]:
+            _cache[cache_key] = entry
+            _cache.move_to_end(cache_key)
+
+        while len(_cache) > FETCH_CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
@@ -3,8 +3,14 @@ from datetime import datetime
 from pydantic import HttpUrl
 
 from config.constants import ITEM_QUANTITY
+from models.comparison import PriceComparison
 from models.feed import JsonFeedItem, JsonFeedTopLevel
-from models.query import AmazonAsinQuery, AmazonKeywordQuery, FilterableQuery
+from models.query import (
+    AmazonAsinQuery,
+    AmazonKeywordQuery,
+    ComparisonParams,
+    FilterableQuery,
+)
 from services.url_builder import get_item_url, get_search_url
 from stockholm import Money
 from utils.sanitize import sanitize_html
@@ -72,6 +78,10 @@ def get_top_level_feed(
     if isinstance(query, AmazonKeywordQuery) and query.strict:
         filters.append("strict")
 
+    # Add filter expression
+    if query.item_filter:
+        filters.append(f"filter {query.item_filter.expression}")
+
     # Append filters to title if exists
     if filters:
         title_parts.append(f"filtered by {', '.join(filters)}")
@@ -91,3 +101,26 @@ def get_top_level_feed(
         home_page_url=HttpUrl(url=home_page_url),
         favicon=HttpUrl(url=f"{base_url}/favicon.ico"),
     )
+
+
+def get_comparison_feed(
+    params: ComparisonParams, comparison: PriceComparison
+) -> JsonFeedTopLevel:
+    """Generate a JSON feed of locale offers, describing any locale without one."""
+    feed_items: list[JsonFeedItem] = [
+        generate_feed_item(
+            base_url=f"https://{offer.locale.domain}",
+            item_id=params.asin,
+            item_price=offer.converted_price,
+            item_title=f"{offer.locale.domain} ({offer.price.value})",
+        )
+        for offer in comparison.offers
+    ]
+
+    return JsonFeedTopLevel(
+        version="https://jsonfeed.org/version/1.1",
+        items=feed_items,
+        title=f"{params.asin} - compared in {params.currency} across {', '.join(params.country_codes)}",
+        home_page_url=feed_items[0].url if feed_items else None,
+        description=comparison.describe_failures(),
+    )
@@ -1,9 +1,17 @@
+from pydantic import TypeAdapter
 from pydantic.networks import HttpUrl
 
 from models.amazon.asin import Asin
-from models.json_ld import Offer, Product
+from models.comparison import LocaleOffer, PriceComparison
+from models.json_ld import AggregateOffer, ItemList, ListItem, Offer, Product
+from models.query import ComparisonParams
+from services.url_builder import get_item_url
 from stockholm import Money
 
+_json_ld_adapter: TypeAdapter[list[Product] | ItemList] = TypeAdapter(
+    list[Product] | ItemList
+)
+
 
 def generate_linked_data(
     base_url: str,
@@ -11,7 +19,14 @@ def generate_linked_data(
     item_price: Money | None,
     item_title: str | None = None,
     item_thumbnail_url: str | None = None,
+    trusted_asin: bool = False,
 ) -> Product:
+    """
+    Generate a schema.org Product.
+
+    Set trusted_asin when item_id has already been validated, e.g. by the
+    query model, to skip re-running the ASIN pattern.
+    """
     if not item_price:
         item_offer: Offer = Offer(availability="https://schema.org/OutOfStock")
     else:
@@ -20,7 +35,7 @@ def generate_linked_data(
         )
 
     product: Product = Product(
-        asin=Asin(id=item_id),
+        asin=Asin.model_construct(id=item_id) if trusted_asin else Asin(id=item_id),
         name=item_title,
         image=[HttpUrl(url=item_thumbnail_url)] if item_thumbnail_url else None,
         offers=item_offer,
@@ -29,14 +44,75 @@ def generate_linked_data(
     return product
 
 
-def get_html(feed_items: list[Product]) -> str:
-    serialised_items = (
-        "["
-        + ",".join(
-            [product.model_dump_json(exclude_none=True) for product in feed_items]
-        )
-        + "]"
+def generate_aggregate_offer(
+    params: ComparisonParams, comparison: PriceComparison
+) -> Product:
+    """Generate a Product whose AggregateOffer lists each locale's offer."""
+    offers: list[LocaleOffer] = comparison.offers
+    converted_prices: list[Money] = [offer.converted_price for offer in offers]
+
+    aggregate_offer: AggregateOffer = AggregateOffer(
+        priceCurrency=params.currency,
+        lowPrice=min(converted_prices).amount if offers else None,
+        highPrice=max(converted_prices).amount if offers else None,
+        offerCount=len(offers),
+        offers=[
+            Offer(
+                priceCurrency=offer.price.currency_code,
+                price=offer.price.amount,
+                url=HttpUrl(
+                    url=get_item_url(f"https://{offer.locale.domain}", params.asin)
+                ),
+                eligibleRegion=offer.locale.code,
+            )
+            for offer in offers
+        ],
+    )
+
+    return Product(
+        asin=Asin.model_construct(id=params.asin),
+        name=None,
+        description=comparison.describe_failures(),
+        image=None,
+        offers=aggregate_offer,
     )
 
-    html_text: str = f'<!DOCTYPE html><script type="application/ld+json">{serialised_items}</script><body>{serialised_items}</body></html>'
-    return html_text
+
+def render_json_ld(
+    feed_items: list[Product], include_body: bool = True, item_list: bool = False
+) -> bytes:
+    """
+    Render products as an HTML page carrying a JSON-LD script.
+
+    The products are serialised once and the buffer reused for the optional
+    body copy. Set item_list to wrap them in an ItemList instead of a plain
+    array.
+    """
+    payload: list[Product] | ItemList = feed_items
+
+    if item_list:
+        payload = ItemList(
+            numberOfItems=len(feed_items),
+            itemListElement=[
+                ListItem(position=position, item=product)
+                for position, product in enumerate(feed_items, start=1)
+            ],
+        )
+
+    # Escape closing tags so product names cannot end the script early
+    serialised_items: bytes = _json_ld_adapter.dump_json(
+        payload, exclude_none=True
+    ).replace(b"</", b"<\\/")
+
+    html_parts: list[bytes] = [
+        b'<!DOCTYPE html><script type="application/ld+json">',
+        serialised_items,
+        b"</script>",
+    ]
+
+    if include_body:
+        html_parts.extend([b"<body>", serialised_items, b"</body>"])
+
+    html_parts.append(b"</html>")
+
+    return b"".join(html_parts)
@@ -0,0 +1,91 @@
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from curl_cffi import Response as CurlResponse
+from fastapi.responses import JSONResponse
+from stockholm import Money
+
+from config.constants import ADMISSION_MAX_IN_FLIGHT
+from models.amazon.locale import AmazonLocale, locale_list
+from models.comparison import LocaleFailure, LocaleOffer, PriceComparison
+from models.query import AmazonAsinQuery, ComparisonParams, QueryConfig, QueryStatus
+from models.validators import convert_to_locale
+from parsers.item_parser import parse_item_price
+from services.response_handler import get_response
+from services.url_builder import get_dimension_url
+from utils.fx import convert_price
+
+# Every admitted comparison can look up all locales at once
+_compare_executor: ThreadPoolExecutor = ThreadPoolExecutor(
+    max_workers=ADMISSION_MAX_IN_FLIGHT["compare"] * len(locale_list),
+    thread_name_prefix="compare",
+)
+
+
+def get_locale_offer(
+    params: ComparisonParams,
+    locale: AmazonLocale,
+    create_query_config: Callable[[], QueryConfig],
+) -> LocaleOffer | LocaleFailure:
+    """Look up the ASIN price in one locale and convert it to the target currency."""
+    query: AmazonAsinQuery = AmazonAsinQuery(
+        status=QueryStatus(),
+        query_str=params.asin,
+        locale=locale,
+        config=create_query_config(),
+    )
+
+    base_url: str = f"https://{locale.domain}"
+
+    try:
+        # Comparisons do not use the fetch cache, so they cannot handle a 304
+        response: CurlResponse | JSONResponse = get_response(
+            url=get_dimension_url(base_url, query), query=query, conditional=False
+        )
+    finally:
+        query.config.session.close()
+
+    if not isinstance(response, CurlResponse):
+        return LocaleFailure(locale=locale, reason=f"HTTP {response.status_code}")
+
+    try:
+        price: Money | None = parse_item_price(response, query)
+    except Exception as e:
+        query.config.logger.error(msg=f"{query.query_str} - Parsing error: {e}")
+        return LocaleFailure(locale=locale, reason="parsing error")
+
+    if not price:
+        return LocaleFailure(locale=locale, reason="no price")
+
+    converted_price: Money | None = convert_price(price, params.currency)
+
+    if not converted_price:
+        fx_msg: str = f"no FX rate for {price.currency_code} to {params.currency}"
+        query.config.logger.warning(msg=f"{query.query_str} - {fx_msg}")
+        return LocaleFailure(locale=locale, reason=fx_msg)
+
+    return LocaleOffer(locale=locale, price=price, converted_price=converted_price)
+
+
+def compare_prices(
+    params: ComparisonParams, create_query_config: Callable[[], QueryConfig]
+) -> PriceComparison:
+    """Look up all locales concurrently, ranking offers from cheapest to dearest."""
+    locales: list[AmazonLocale] = [
+        convert_to_locale(value=code) for code in params.country_codes
+    ]
+
+    results: list[LocaleOffer | LocaleFailure] = list(
+        _compare_executor.map(
+            lambda locale: get_locale_offer(params, locale, create_query_config),
+            locales,
+        )
+    )
+
+    return PriceComparison(
+        offers=sorted(
+            (result for result in results if isinstance(result, LocaleOffer)),
+            key=lambda offer: offer.converted_price.amount,
+        ),
+        failures=[result for result in results if isinstance(result, LocaleFailure)],
+    )
@@ -1,13 +1,66 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from http import HTTPStatus
 from logging import Logger
+from random import uniform
+from time import monotonic, sleep
 import re
 
-from curl_cffi.requests.exceptions import RequestException
+from curl_cffi.requests.exceptions import (
+    ChunkedEncodingError,
+    ConnectionError,
+    IncompleteRead,
+    RequestException,
+    Timeout,
+)
 from curl_cffi import Response as CurlResponse, Session
 from fastapi.responses import JSONResponse
 
-from config.constants import CFFI_IMPERSONATE, HEADERS
-from models.query import FilterableQuery
+from config.constants import (
+    ADMISSION_MAX_IN_FLIGHT,
+    CFFI_IMPERSONATE,
+    HEADERS,
+    HEDGE_LATENCY_SAMPLES,
+    HEDGE_MIN_SAMPLES,
+    RETRY_STATUS_CODES,
+)
+from models.amazon.locale import locale_list
+from models.query import AmazonKeywordQuery, FilterableQuery, RetryPolicy
+from services.fetch_cache import get_conditional_headers
+
+# Bot/paywall detection
+BOT_PATTERNS: list[re.Pattern[str]] = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in [
+        r"bot",
+        r"captcha",
+        r"challenge",
+        r"verify",
+        r"blocked",
+        r"automated",
+    ]
+]
+
+TRANSIENT_EXCEPTIONS: tuple[type[RequestException], ...] = (
+    Timeout,
+    ConnectionError,
+    ChunkedEncodingError,
+    IncompleteRead,
+)
+
+# Latency samples per request kind and locale, e.g. "search:US"
+_latencies: dict[str, deque[float]] = {}
+# Every concurrent upstream GET, including one per locale for each admitted
+# comparison, may need a primary and a hedge worker
+_hedge_executor: ThreadPoolExecutor = ThreadPoolExecutor(
+    max_workers=2
+    * (
+        ADMISSION_MAX_IN_FLIGHT["query"]
+        + ADMISSION_MAX_IN_FLIGHT["asin"]
+        + ADMISSION_MAX_IN_FLIGHT["compare"] * len(locale_list)
+    ),
+    thread_name_prefix="hedge",
+)
 
 
 def clear_session_cookies(query: FilterableQuery) -> None:
@@ -15,60 +68,245 @@ def clear_session_cookies(query: FilterableQuery) -> None:
     query.config.session.cookies.clear()
 
 
-def get_response(url: str, query: FilterableQuery) -> CurlResponse | JSONResponse:
+def is_bot_response(response: CurlResponse) -> bool:
+    return response.status_code == 404 or any(
+        pattern.search(response.text) for pattern in BOT_PATTERNS
+    )
+
+
+def get_latency_key(query: FilterableQuery) -> str:
+    """Search pages and dimension lookups differ in size, so are sampled apart."""
+    kind: str = "search" if isinstance(query, AmazonKeywordQuery) else "dimension"
+    return f"{kind}:{query.locale.code}"
+
+
+def record_latency(latency_key: str, latency: float) -> None:
+    _latencies.setdefault(latency_key, deque(maxlen=HEDGE_LATENCY_SAMPLES)).append(
+        latency
+    )
+
+
+def export_latencies() -> dict[str, list[float]]:
+    return {key: list(samples) for key, samples in _latencies.items()}
+
+
+def import_latencies(samples: dict[str, list[float]]) -> None:
+    """Restore latency samples behind any recorded since startup."""
+    for key, restored in samples.items():
+        fresh: list[float] = list(_latencies.get(key, []))
+        _latencies[key] = deque([*restored, *fresh], maxlen=HEDGE_LATENCY_SAMPLES)
+
+
+def get_hedge_delay(latency_key: str) -> float | None:
+    """Return the observed p95 upstream latency, or None until enough samples exist."""
+    samples: list[float] = sorted(_latencies.get(latency_key, []))
+
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return None
+
+    return samples[int(len(samples) * 0.95) - 1]
+
+
+def get_backoff_delay(policy: RetryPolicy, attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+    return uniform(0, min(policy.backoff_max, policy.backoff_base * 2 ** (attempt - 1)))
+
+
+def retry_after_backoff(policy: RetryPolicy, attempt: int, deadline: float) -> bool:
+    """Sleep before the next attempt, returning False if the deadline would pass."""
+    delay: float = get_backoff_delay(policy, attempt)
+
+    if monotonic() + delay >= deadline:
+        return False
+
+    sleep(delay)
+    return True
+
+
+def send_request(
+    session: Session,
+    url: str,
+    headers: dict[str, str],
+    timeout: float,
+    latency_key: str,
+) -> CurlResponse:
+    start: float = monotonic()
+
+    # Failed and timed out attempts are sampled too, so p95 is not optimistic
+    try:
+        return session.get(
+            url,
+            impersonate=CFFI_IMPERSONATE,
+            default_headers=False,
+            headers=headers,
+            timeout=timeout,
+        )
+    finally:
+        record_latency(latency_key, monotonic() - start)
+
+
+def send_hedged_request(
+    url: str,
+    headers: dict[str, str],
+    query: FilterableQuery,
+    timeout: float,
+    hedge_delay: float | None,
+) -> CurlResponse:
+    """
+    Send a request, duplicating it on a fresh connection if it runs past p95.
+
+    The first response to arrive wins; the slower request is left to finish
+    in the background and its result is discarded. No wait outlasts timeout,
+    even if the executor is saturated.
+
+    If the primary request is left running, the query moves on to a copy of
+    its session, and the old session is closed once the primary is done.
     """
-    Send a GET request with error handling and bot detection.
+    session: Session = query.config.session
+    latency_key: str = get_latency_key(query)
+
+    if not hedge_delay:
+        return send_request(session, url, headers, timeout, latency_key)
+
+    deadline: float = monotonic() + timeout
+    primary: Future[CurlResponse] = _hedge_executor.submit(
+        send_request, session, url, headers, timeout, latency_key
+    )
+    done, _ = wait([primary], timeout=hedge_delay)
+
+    if done:
+        return primary.result()
+
+    query.config.logger.debug(
+        msg=f"{query.query_str} - hedging after {hedge_delay:.2f}s"
+    )
+
+    # curl_cffi sessions are not thread-safe, so the duplicate gets its own
+    hedge_session: Session = Session(cookies=session.cookies)
+    hedge: Future[CurlResponse] = _hedge_executor.submit(
+        send_request,
+        hedge_session,
+        url,
+        headers,
+        timeout - hedge_delay,
+        latency_key,
+    )
+    hedge.add_done_callback(lambda _: hedge_session.close())
+    pending: set[Future[CurlResponse]] = {primary, hedge}
+
+    try:
+        while True:
+            done, pending = wait(
+                pending,
+                timeout=max(0, deadline - monotonic()),
+                return_when=FIRST_COMPLETED,
+            )
+
+            for future in done:
+                if not future.exception():
+                    return future.result()
+
+            if not done:
+                raise Timeout(f"Hedged request timed out after {timeout:.2f}s")
+
+            if not pending:
+                return done.pop().result()
+    finally:
+        if not primary.done():
+            query.config.session = Session(cookies=session.cookies)
+            primary.add_done_callback(lambda _: session.close())
+
+
+def get_response(
+    url: str, query: FilterableQuery, conditional: bool = True
+) -> CurlResponse | JSONResponse:
+    """
+    Send a GET request with retries, error handling and bot detection.
+
+    Set conditional=False to send no cache validators, e.g. when the caller
+    cannot handle a 304 Not Modified.
 
     Handles:
-    - Request exceptions
-    - Bot detection
-    - HTTP error responses
+    - Request exceptions (retried when transient)
+    - Conditional requests (304 Not Modified)
+    - Bot detection (never retried)
+    - HTTP error responses (retried for 5xx)
     """
     logger: Logger = query.config.logger
-    session: Session = query.config.session
+    policy: RetryPolicy = query.config.retry_policy
+    deadline: float = monotonic() + policy.overall_timeout
 
     # Prepare headers
     headers: dict[str, str] = HEADERS.copy()
     headers["User-Agent"] = query.config.useragent
     headers["Referer"] = f"https://{query.locale.domain}/"
 
+    if conditional:
+        headers.update(get_conditional_headers(url, query))
+
     logger.debug(msg=f"{query.query_str} - querying: {url}")
 
-    try:
-        response: CurlResponse = session.get(
-            url, impersonate=CFFI_IMPERSONATE, default_headers=False, headers=headers
+    attempt: int = 0
+
+    while True:
+        attempt += 1
+        timeout: float = min(policy.attempt_timeout, deadline - monotonic())
+        is_last_attempt: bool = attempt >= policy.max_attempts
+
+        hedge_delay: float | None = (
+            get_hedge_delay(get_latency_key(query)) if policy.hedge else None
         )
 
-        # Bot/paywall detection
-        bot_patterns: list[str] = [
-            r"bot",
-            r"captcha",
-            r"challenge",
-            r"verify",
-            r"blocked",
-            r"automated",
-        ]
-
-        if not response.ok:
-            # Paywall or bot detection
-            if response.status_code == 404 or any(
-                re.search(pattern, response.text, re.IGNORECASE)
-                for pattern in bot_patterns
-            ):
-                bot_msg: str = f"{query.query_str} - API paywall or bot detection"
-                clear_session_cookies(query)
-                logger.warning(msg=bot_msg)
-
-            # Other HTTP errors
-            logger.error(msg=f"{query.query_str} - HTTP error: {response.status_code}")
-            logger.debug(msg=f"Response text: {response.text}")
-            return JSONResponse(response.text, response.status_code)
-
-        # Log caching status
-        logger.debug(msg=f"{query.query_str}")
-        return response
-
-    except RequestException as rex:
-        clear_session_cookies(query)
-        logger.error(msg=f"{query.query_str} - Request error: {rex}")
-        return JSONResponse(content=rex, status_code=HTTPStatus.INTERNAL_SERVER_ERROR)
+        try:
+            response: CurlResponse = send_hedged_request(
+                url,
+                headers,
+                query,
+                timeout=timeout,
+                hedge_delay=(
+                    hedge_delay if hedge_delay and hedge_delay < timeout else None
+                ),
+            )
+
+            if response.status_code == HTTPStatus.NOT_MODIFIED:
+                logger.debug(msg=f"{query.query_str} - upstream not modified")
+                return response
+
+            if not response.ok:
+                # Paywall or bot detection
+                if is_bot_response(response):
+                    bot_msg: str = f"{query.query_str} - API paywall or bot detection"
+                    clear_session_cookies(query)
+                    logger.warning(msg=bot_msg)
+
+                elif response.status_code in RETRY_STATUS_CODES and not is_last_attempt:
+                    logger.warning(
+                        msg=f"{query.query_str} - HTTP error: {response.status_code}, attempt {attempt}"
+                    )
+                    if retry_after_backoff(policy, attempt, deadline):
+                        continue
+
+                # Other HTTP errors
+                logger.error(
+                    msg=f"{query.query_str} - HTTP error: {response.status_code}"
+                )
+                logger.debug(msg=f"Response text: {response.text}")
+                return JSONResponse(response.text, response.status_code)
+
+            # Log caching status
+            logger.debug(msg=f"{query.query_str}")
+            return response
+
+        except RequestException as rex:
+            if isinstance(rex, TRANSIENT_EXCEPTIONS) and not is_last_attempt:
+                logger.warning(
+                    msg=f"{query.query_str} - Request error: {rex}, attempt {attempt}"
+                )
+                if retry_after_backoff(policy, attempt, deadline):
+                    continue
+
+            clear_session_cookies(query)
+            logger.error(msg=f"{query.query_str} - Request error: {rex}")
+            return JSONResponse(
+                content=str(rex), status_code=HTTPStatus.INTERNAL_SERVER_ERROR
+            )
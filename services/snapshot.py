@@ -0,0 +1,152 @@
+import json
+import os
+import sqlite3
+from logging import Logger, getLogger
+from threading import Event, Thread
+
+from pydantic import TypeAdapter, ValidationError
+
+from config.constants import SNAPSHOT_DIR, SNAPSHOT_FILENAME, SNAPSHOT_INTERVAL
+from services import fetch_cache, response_handler
+
+logger: Logger = getLogger(name="uvicorn.error")
+
+_latencies_adapter: TypeAdapter[dict[str, list[float]]] = TypeAdapter(
+    dict[str, list[float]]
+)
+_stop_event: Event = Event()
+_snapshot_thread: Thread | None = None
+
+
+def get_snapshot_path() -> str | None:
+    return os.path.join(SNAPSHOT_DIR, SNAPSHOT_FILENAME) if SNAPSHOT_DIR else None
+
+
+def save_snapshot(path: str) -> None:
+    """
+    Write the fetch cache and latency samples to a SQLite file.
+
+    The snapshot is written to a temporary file and atomically renamed, so
+    a crash mid-write leaves the previous snapshot intact.
+    """
+    temp_path: str = f"{path}.tmp"
+
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    entries: list[tuple[str, fetch_cache.CachedFetch]] = fetch_cache.export_entries()
+
+    with sqlite3.connect(temp_path) as conn:
+        conn.execute(
+            "CREATE TABLE fetch_cache (position INTEGER PRIMARY KEY, key TEXT, entry TEXT)"
+        )
+        conn.execute("CREATE TABLE state (name TEXT PRIMARY KEY, value TEXT)")
+        conn.executemany(
+            "INSERT INTO fetch_cache VALUES (?, ?, ?)",
+            [
+                (position, key, entry.model_dump_json())
+                for position, (key, entry) in enumerate(entries)
+            ],
+        )
+        conn.execute(
+            "INSERT INTO state VALUES (?, ?)",
+            ("latencies", json.dumps(response_handler.export_latencies())),
+        )
+    conn.close()
+
+    with open(temp_path, "rb") as f:
+        os.fsync(f.fileno())
+
+    os.replace(temp_path, path)
+    logger.debug(msg=f"Snapshot saved {len(entries)} cache entries to {path}")
+
+
+def load_snapshot(path: str) -> None:
+    """Restore the fetch cache and latency samples from a SQLite file."""
+    if not os.path.exists(path):
+        return
+
+    entries: list[tuple[str, fetch_cache.CachedFetch]] = []
+
+    with sqlite3.connect(f"file:{path}?mode=ro", uri=True) as conn:
+        for key, entry in conn.execute(
+            "SELECT key, entry FROM fetch_cache ORDER BY position"
+        ):
+            # Entries written by an older model layout are dropped, not trusted
+            try:
+                entries.append(
+                    (key, fetch_cache.CachedFetch.model_validate_json(entry))
+                )
+            except ValidationError as e:
+                logger.warning(msg=f"Snapshot skipped cache entry {key}: {e}")
+
+        latencies: tuple[str] | None = conn.execute(
+            "SELECT value FROM state WHERE name = 'latencies'"
+        ).fetchone()
+    conn.close()
+
+    fetch_cache.import_entries(entries)
+
+    if latencies:
+        # Samples written before they were kept per request kind are dropped
+        try:
+            response_handler.import_latencies(
+                _latencies_adapter.validate_json(latencies[0])
+            )
+        except ValidationError as e:
+            logger.warning(msg=f"Snapshot skipped latency samples: {e}")
+
+    logger.info(msg=f"Snapshot restored {len(entries)} cache entries from {path}")
+
+
+def _run_snapshots(path: str) -> None:
+    try:
+        load_snapshot(path)
+    except Exception as e:
+        logger.error(msg=f"Snapshot load error: {e}")
+    finally:
+        fetch_cache.warm_event.set()
+
+    while not _stop_event.wait(timeout=SNAPSHOT_INTERVAL):
+        try:
+            save_snapshot(path)
+        except Exception as e:
+            logger.error(msg=f"Snapshot save error: {e}")
+
+
+def start_snapshots() -> None:
+    """Warm-load the last snapshot in the background, then save periodically."""
+    global _snapshot_thread
+
+    path: str | None = get_snapshot_path()
+
+    if not path or _snapshot_thread:
+        return
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fetch_cache.warm_event.clear()
+    _stop_event.clear()
+
+    _snapshot_thread = Thread(
+        target=_run_snapshots, args=(path,), name="snapshot", daemon=True
+    )
+    _snapshot_thread.start()
+
+
+def stop_snapshots() -> None:
+    """Stop periodic snapshots and write a final one."""
+    global _snapshot_thread
+
+    path: str | None = get_snapshot_path()
+
+    if not path or not _snapshot_thread:
+        return
+
+    _stop_event.set()
+    _snapshot_thread.join()
+    _snapshot_thread = None
+
+    try:
+        save_snapshot(path)
+    except Exception as e:
+        logger.error(msg=f"Snapshot save error: {e}")
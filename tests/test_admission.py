@@ -0,0 +1,68 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from services.admission import AdmissionGate
+
+
+class AdmissionGateTest(unittest.IsolatedAsyncioTestCase):
+    async def test_queued_request_is_admitted_on_release(self) -> None:
+        gate: AdmissionGate = AdmissionGate(
+            max_in_flight=1, max_queue=1, queue_timeout=1
+        )
+        self.assertTrue(await gate.acquire())
+
+        waiting: asyncio.Task[bool] = asyncio.create_task(gate.acquire())
+        await asyncio.sleep(0)
+        gate.release()
+
+        self.assertTrue(await waiting)
+        self.assertEqual(gate.in_flight, 1)
+
+    async def test_full_queue_is_rejected(self) -> None:
+        gate: AdmissionGate = AdmissionGate(
+            max_in_flight=1, max_queue=0, queue_timeout=1
+        )
+        self.assertTrue(await gate.acquire())
+        self.assertFalse(await gate.acquire())
+        self.assertEqual(gate.rejected, 1)
+
+    async def test_handover_racing_timeout_keeps_slot(self) -> None:
+        gate: AdmissionGate = AdmissionGate(
+            max_in_flight=1, max_queue=1, queue_timeout=1
+        )
+        self.assertTrue(await gate.acquire())
+
+        # The slot is handed over in the same iteration the deadline fires
+        async def handover_then_timeout(waiter, timeout):
+            gate.release()
+            raise asyncio.TimeoutError
+
+        with patch("services.admission.asyncio.wait_for", handover_then_timeout):
+            self.assertTrue(await gate.acquire())
+
+        self.assertEqual(gate.in_flight, 1)
+        self.assertEqual(gate.timed_out, 0)
+
+        gate.release()
+        self.assertEqual(gate.in_flight, 0)
+
+    async def test_handover_racing_cancellation_passes_slot_on(self) -> None:
+        gate: AdmissionGate = AdmissionGate(
+            max_in_flight=1, max_queue=1, queue_timeout=1
+        )
+        self.assertTrue(await gate.acquire())
+
+        async def handover_then_cancel(waiter, timeout):
+            gate.release()
+            raise asyncio.CancelledError
+
+        with patch("services.admission.asyncio.wait_for", handover_then_cancel):
+            with self.assertRaises(asyncio.CancelledError):
+                await gate.acquire()
+
+        self.assertEqual(gate.in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
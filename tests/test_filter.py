@@ -0,0 +1,35 @@
+import unittest
+
+from utils.filter import compile_filter
+
+
+class CompileFilterTest(unittest.TestCase):
+    def test_apostrophes_are_part_of_terms(self) -> None:
+        item_filter = compile_filter("men's -levi's \"running shoes\"")
+
+        self.assertEqual(item_filter.include_terms, ("men's", "running shoes"))
+        self.assertEqual(item_filter.exclude_terms, ("levi's",))
+        self.assertTrue(item_filter.match_title("Men's Running Shoes"))
+
+    def test_regex_matches_title(self) -> None:
+        item_filter = compile_filter(r"/\bgtx\s?\d{4}\b/ -/refurb(ished)?/")
+
+        self.assertTrue(item_filter.match_title("MSI GeForce GTX 1660 Super"))
+        self.assertFalse(item_filter.match_title("Refurbished GTX 1080"))
+
+    def test_regex_rejects_catastrophic_backtracking(self) -> None:
+        for expression in (
+            r"/(\w+\s?)*$!/",
+            r"/(a|aa)+$/",
+            r"/(a?){20}a{20}/",
+            r"/(x)\1/",
+            r"/\w*\w*\w*!/",
+            f"/{'a' * 65}/",
+        ):
+            with self.subTest(expression=expression):
+                with self.assertRaises(ValueError):
+                    compile_filter(expression)
+
+
+if __name__ == "__main__":
+    unittest.main()
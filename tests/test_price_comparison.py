@@ -0,0 +1,66 @@
+import unittest
+from logging import getLogger
+from unittest.mock import patch
+
+from curl_cffi import Response as CurlResponse, Session
+from fastapi.responses import JSONResponse
+from stockholm import Money
+
+from models.query import ComparisonParams, QueryConfig
+from services import price_comparison
+
+
+def create_query_config() -> QueryConfig:
+    return QueryConfig(session=Session(), logger=getLogger(), useragent="test")
+
+
+class ComparePricesTest(unittest.TestCase):
+    def test_failed_locales_are_reported(self) -> None:
+        params: ComparisonParams = ComparisonParams(
+            asin="B000000000", countries="UK,US", currency="EUR"
+        )
+
+        with patch.object(
+            price_comparison,
+            "get_response",
+            return_value=JSONResponse("unavailable", status_code=503),
+        ):
+            comparison = price_comparison.compare_prices(params, create_query_config)
+
+        self.assertEqual(comparison.offers, [])
+        self.assertEqual(
+            comparison.describe_failures(), "No offer from UK (HTTP 503), US (HTTP 503)"
+        )
+
+    def test_offers_are_ranked_and_missing_rates_reported(self) -> None:
+        params: ComparisonParams = ComparisonParams(
+            asin="B000000000", countries="UK,US,DE", currency="EUR"
+        )
+        prices: dict[str, Money] = {
+            "UK": Money(100, "GBP"),
+            "US": Money(100, "USD"),
+            "DE": Money(100, "XYZ"),
+        }
+
+        with (
+            patch.object(price_comparison, "get_response", return_value=CurlResponse()),
+            patch.object(
+                price_comparison,
+                "parse_item_price",
+                side_effect=lambda _, query: prices[query.locale.code],
+            ),
+            self.assertLogs(level="WARNING"),
+        ):
+            comparison = price_comparison.compare_prices(params, create_query_config)
+
+        self.assertEqual(
+            [offer.locale.code for offer in comparison.offers], ["US", "UK"]
+        )
+        self.assertEqual(
+            comparison.describe_failures(),
+            "No offer from DE (no FX rate for XYZ to EUR)",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+from itertools import count
+from logging import getLogger
+from time import sleep
+from unittest.mock import MagicMock, patch
+
+from curl_cffi import Response as CurlResponse, Session
+from curl_cffi.requests.exceptions import Timeout
+
+from models.query import AmazonAsinQuery, QueryConfig, QueryStatus, RetryPolicy
+from services import response_handler
+
+
+class FakeSession(Session):
+    """Primary requests hang, hedges fail fast with 503."""
+
+    calls: count = count()
+    opened: list["FakeSession"] = []
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.is_closed: bool = False
+        FakeSession.opened.append(self)
+
+    def get(self, url: str, **kwargs) -> CurlResponse:
+        response: CurlResponse = CurlResponse()
+        response.status_code = 503
+        response.ok = False
+        response.content = b""
+
+        if next(FakeSession.calls) % 2 == 0:
+            sleep(0.3)
+
+        return response
+
+    def close(self) -> None:
+        self.is_closed = True
+        super().close()
+
+
+class LatencySamplingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        patcher = patch.object(response_handler, "_latencies", {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_hedge_delay_is_kept_per_request_kind(self) -> None:
+        response_handler.import_latencies(
+            {"search:US": [2.0] * 20, "dimension:US": [0.1] * 20}
+        )
+
+        self.assertEqual(response_handler.get_hedge_delay("search:US"), 2.0)
+        self.assertEqual(response_handler.get_hedge_delay("dimension:US"), 0.1)
+        self.assertIsNone(response_handler.get_hedge_delay("search:UK"))
+
+    def test_failed_attempts_are_sampled(self) -> None:
+        session: MagicMock = MagicMock()
+        session.get.side_effect = Timeout("timed out")
+
+        with self.assertRaises(Timeout):
+            response_handler.send_request(
+                session, "https://example.com", {}, 1.0, "search:US"
+            )
+
+        self.assertEqual(len(response_handler.export_latencies()["search:US"]), 1)
+
+
+class HedgedSessionTest(unittest.TestCase):
+    def setUp(self) -> None:
+        patcher = patch.object(
+            response_handler, "_latencies", {"dimension:US": [0.05] * 20}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        FakeSession.calls = count()
+        FakeSession.opened = []
+
+    def test_sessions_are_closed_after_hedged_retries(self) -> None:
+        query: AmazonAsinQuery = AmazonAsinQuery(
+            status=QueryStatus(),
+            query_str="B000000000",
+            config=QueryConfig(
+                session=FakeSession(),
+                logger=getLogger(),
+                useragent="test",
+                retry_policy=RetryPolicy(max_attempts=2, backoff_max=0.01),
+            ),
+        )
+
+        with (
+            patch.object(response_handler, "Session", FakeSession),
+            self.assertLogs(level="WARNING"),
+        ):
+            response = response_handler.get_response(
+                "https://www.amazon.com", query, conditional=False
+            )
+            self.assertEqual(response.status_code, 503)
+
+            # Each attempt left its primary running, so moved to a new session
+            self.assertEqual(len(FakeSession.opened), 5)
+            self.assertIs(query.config.session, FakeSession.opened[-1])
+
+        query.config.session.close()
+        sleep(0.5)
+
+        self.assertTrue(all(session.is_closed for session in FakeSession.opened))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import re
+import re._constants as sre_constants
+import re._parser as sre_parser
+import shlex
+from functools import lru_cache
+
+from config.constants import (
+    FILTER_CACHE_SIZE,
+    FILTER_REGEX_MAX_LENGTH,
+    FILTER_REGEX_MAX_REPEATS,
+)
+from models.filter import ItemFilter
+
+
+def _parse_price_range(value: str) -> tuple[float | None, float | None]:
+    lower, separator, upper = value.partition("-")
+
+    if not separator:
+        raise ValueError(f"Invalid price range: {value}")
+
+    try:
+        return (float(lower) if lower else None, float(upper) if upper else None)
+    except ValueError:
+        raise ValueError(f"Invalid price range: {value}")
+
+
+_REPEAT_OPS = {
+    sre_constants.MAX_REPEAT,
+    sre_constants.MIN_REPEAT,
+    sre_constants.POSSESSIVE_REPEAT,
+}
+_BACKREFERENCE_OPS = {sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS}
+
+
+def _count_regex_repeats(subpattern: sre_parser.SubPattern, is_repeated: bool) -> int:
+    """Count quantifiers, rejecting the constructs that backtrack exponentially."""
+    repeats: int = 0
+
+    for op, av in subpattern:
+        if op in _BACKREFERENCE_OPS:
+            raise ValueError("backreferences are not supported")
+
+        if op in _REPEAT_OPS:
+            if is_repeated:
+                raise ValueError("nested quantifiers are not supported")
+            repeats += 1 + _count_regex_repeats(av[2], is_repeated=True)
+
+        elif op is sre_constants.BRANCH:
+            if is_repeated:
+                raise ValueError("alternation inside a quantifier is not supported")
+            repeats += sum(_count_regex_repeats(item, is_repeated) for item in av[1])
+
+        elif op is sre_constants.SUBPATTERN:
+            repeats += _count_regex_repeats(av[3], is_repeated)
+
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            repeats += _count_regex_repeats(av[1], is_repeated)
+
+        elif op is sre_constants.ATOMIC_GROUP:
+            repeats += _count_regex_repeats(av, is_repeated)
+
+    return repeats
+
+
+def _compile_regex(value: str) -> re.Pattern[str]:
+    """
+    Compile a user-supplied regex, restricted so matching stays cheap.
+
+    The re engine backtracks and holds the GIL while matching, so patterns
+    are capped in length and quantifiers, and may not nest quantifiers,
+    alternate inside a quantifier or use backreferences.
+    """
+    if len(value) > FILTER_REGEX_MAX_LENGTH:
+        raise ValueError(f"longer than {FILTER_REGEX_MAX_LENGTH} characters")
+
+    try:
+        repeats: int = _count_regex_repeats(sre_parser.parse(value), False)
+        pattern: re.Pattern[str] = re.compile(value, re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(str(e))
+
+    if repeats > FILTER_REGEX_MAX_REPEATS:
+        raise ValueError(f"more than {FILTER_REGEX_MAX_REPEATS} quantifiers")
+
+    return pattern
+
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def compile_filter(expression: str) -> ItemFilter:
+    """
+    Compile a filter expression, caching the result per distinct expression.
+
+    Tokens are separated by spaces, double quote to keep phrases together:
+    - term, "some phrase": title must contain it
+    - -term: title must not contain it
+    - /regex/, -/regex/: title must (not) match, case-insensitive
+    - price:min-max, price:min-, price:-max: price range
+    - has:thumbnail: item must have a product image
+    """
+    include_terms: list[str] = []
+    exclude_terms: list[str] = []
+    include_patterns: list[re.Pattern[str]] = []
+    exclude_patterns: list[re.Pattern[str]] = []
+    min_price: float | None = None
+    max_price: float | None = None
+    has_thumbnail: bool = False
+
+    # Split like a shell, but keep backslashes for regexes and apostrophes in terms
+    lexer: shlex.shlex = shlex.shlex(expression, posix=True)
+    lexer.whitespace_split = True
+    lexer.quotes = '"'
+    lexer.escape = ""
+    lexer.commenters = ""
+
+    for token in lexer:
+        is_excluded: bool = token.startswith("-") and len(token) > 1
+        value: str = token[1:] if is_excluded else token
+
+        if len(value) > 2 and value.startswith("/") and value.endswith("/"):
+            try:
+                pattern: re.Pattern[str] = _compile_regex(value[1:-1])
+            except ValueError as e:
+                raise ValueError(f"Invalid filter regex {value}: {e}")
+            (exclude_patterns if is_excluded else include_patterns).append(pattern)
+
+        elif not is_excluded and value.startswith("price:"):
+            min_price, max_price = _parse_price_range(value.removeprefix("price:"))
+
+        elif not is_excluded and value == "has:thumbnail":
+            has_thumbnail = True
+
+        else:
+            (exclude_terms if is_excluded else include_terms).append(value.lower())
+
+    return ItemFilter(
+        expression=expression,
+        include_terms=tuple(include_terms),
+        exclude_terms=tuple(exclude_terms),
+        include_patterns=tuple(include_patterns),
+        exclude_patterns=tuple(exclude_patterns),
+        min_price=min_price,
+        max_price=max_price,
+        has_thumbnail=has_thumbnail,
+    )
@@ -0,0 +1,50 @@
+import json
+import os
+from decimal import Decimal
+from threading import Lock
+
+from pydantic import BaseModel
+from stockholm import Money
+
+from config.constants import FX_RATES_FILE
+
+
+class FxRates(BaseModel):
+    base: str
+    rates: dict[str, Decimal]
+
+
+_rates: FxRates | None = None
+_rates_mtime: float | None = None
+_rates_lock: Lock = Lock()
+
+
+def get_fx_rates(path: str = FX_RATES_FILE) -> FxRates:
+    """Return the FX rate table, reloading it only when the file has changed."""
+    global _rates, _rates_mtime
+
+    mtime: float = os.stat(path).st_mtime
+
+    with _rates_lock:
+        if _rates is None or mtime != _rates_mtime:
+            with open(path, encoding="utf-8") as f:
+                _rates = FxRates.model_validate(json.load(f))
+            _rates_mtime = mtime
+
+        return _rates
+
+
+def convert_price(price: Money, currency_code: str) -> Money | None:
+    """Convert a price via the base currency, or None if either rate is unknown."""
+    rates: dict[str, Decimal] = get_fx_rates().rates
+    from_rate: Decimal | None = rates.get(str(price.currency_code))
+    to_rate: Decimal | None = rates.get(currency_code)
+
+    if not from_rate or not to_rate:
+        return None
+
+    converted: Money = Money(
+        amount=price.amount / from_rate * to_rate, currency_code=currency_code
+    )
+
+    return round(converted, 2)
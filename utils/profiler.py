@@ -0,0 +1,84 @@
+import os
+import sys
+from collections import Counter
+from datetime import datetime
+from threading import Event, Thread, get_ident
+from types import FrameType, TracebackType
+
+from config.constants import PROFILE_DIR, PROFILE_INTERVAL, PROFILE_RING_SIZE
+
+
+def _get_frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class SamplingProfiler:
+    """
+    Sample the calling thread's stack at a fixed interval.
+
+    Samples are aggregated as collapsed stacks ("outer;inner count" per line),
+    the input format of flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL) -> None:
+        self.interval: float = interval
+        self.samples: Counter[str] = Counter()
+        self._thread_id: int = get_ident()
+        self._stop_event: Event = Event()
+        self._sampler: Thread = Thread(
+            target=self._sample, name="profiler", daemon=True
+        )
+
+    def _sample(self) -> None:
+        while not self._stop_event.wait(timeout=self.interval):
+            frame: FrameType | None = sys._current_frames().get(self._thread_id)
+            stack: list[str] = []
+
+            while frame is not None:
+                stack.append(_get_frame_label(frame))
+                frame = frame.f_back
+
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def __enter__(self) -> "SamplingProfiler":
+        self._sampler.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._stop_event.set()
+        self._sampler.join()
+
+    def get_collapsed_stacks(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.items())
+
+
+def save_profile(collapsed_stacks: str, name: str) -> str | None:
+    """Write a profile to the ring buffer directory, keeping the newest files only."""
+    if not PROFILE_DIR:
+        return None
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+
+    timestamp: str = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    path: str = os.path.join(PROFILE_DIR, f"{timestamp}-{name}.folded")
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(collapsed_stacks)
+
+    profiles: list[str] = sorted(
+        entry for entry in os.listdir(PROFILE_DIR) if entry.endswith(".folded")
+    )
+
+    for stale_profile in profiles[:-PROFILE_RING_SIZE]:
+        os.remove(os.path.join(PROFILE_DIR, stale_profile))
+
+    return path